@@ -4,6 +4,7 @@ Fully dynamic - all domains loaded from JSON templates.
 """
 import sys
 import os
+import logging
 from pathlib import Path
 
 # Add src to path
@@ -13,6 +14,18 @@ from tax_generator import TaxGenerator
 from tax_domains import TaxDomainManager
 
 
+def setup_logging() -> None:
+    """
+    Send generator progress to stdout alongside this script's own output.
+    
+    Records are written synchronously by the calling thread, so log lines stay
+    in order with the prints below; StreamHandler is already thread-safe.
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    # httpx logs every request at INFO; keep the console to generator progress
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
 def main():
     """Main function - fully dynamic case generation."""
     print("MuSR-SynTax: Synthetic Tax Law Data Generator")
@@ -74,5 +87,6 @@ def main():
 
 
 if __name__ == "__main__":
+    setup_logging()
     success = main()
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -6,6 +6,38 @@ from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
 import json
 import os
+import re
+import tempfile
+
+try:
+    import orjson
+except ImportError:  # optional faster JSON encoder
+    orjson = None
+
+
+def _current_umask() -> int:
+    """Read the process umask (os.umask can only be read by setting it)."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Mode open() gives new files; read once at import, since changing the umask
+# is process-wide and would race with other threads creating files
+_NEW_FILE_MODE = 0o666 & ~_current_umask()
+
+
+# Rule indicators
+_RULE_KEYWORDS = ('deductible', 'section', 'irc', 'code', 'law', 'regulation',
+                  'must be', 'required', 'percent', '%', 'under')
+
+# Conclusion indicators
+_CONCLUSION_KEYWORDS = ('qualifies', 'therefore', 'result', 'conclusion',
+                        'deduction allowed', 'not deductible')
+
+# One alternation per fact type so each check is a single scan in C
+_RULE_PATTERN = re.compile('|'.join(map(re.escape, _RULE_KEYWORDS)), re.IGNORECASE)
+_CONCLUSION_PATTERN = re.compile('|'.join(map(re.escape, _CONCLUSION_KEYWORDS)), re.IGNORECASE)
 
 
 def classify_fact_type(fact: str) -> str:
@@ -18,25 +50,30 @@ def classify_fact_type(fact: str) -> str:
     Returns:
         Classification as "story", "rule", or "conclusion"
     """
-    fact_lower = fact.lower()
-    
-    # Rule indicators
-    rule_keywords = ['deductible', 'section', 'irc', 'code', 'law', 'regulation', 
-                    'must be', 'required', 'percent', '%', 'under']
-    if any(keyword in fact_lower for keyword in rule_keywords):
+    if _RULE_PATTERN.search(fact):
         return "rule"
     
-    # Conclusion indicators  
-    conclusion_keywords = ['qualifies', 'therefore', 'result', 'conclusion', 
-                          'deduction allowed', 'not deductible']
-    if any(keyword in fact_lower for keyword in conclusion_keywords):
+    if _CONCLUSION_PATTERN.search(fact):
         return "conclusion"
     
     # Default to story (what happened)
     return "story"
 
 
-@dataclass
+def classify_facts_bulk(facts: List[str]) -> List[str]:
+    """
+    Classify several facts at once.
+    
+    Args:
+        facts: The fact text contents to classify
+        
+    Returns:
+        Classifications in the same order as the input facts
+    """
+    return [classify_fact_type(fact) for fact in facts]
+
+
+@dataclass(slots=True)
 class TaxFact:
     """A single fact in our tax reasoning case."""
     content: str
@@ -46,7 +83,7 @@ class TaxFact:
         return f"[{self.fact_type}] {self.content}"
 
 
-@dataclass
+@dataclass(slots=True)
 class TaxCase:
     """A complete generated tax reasoning case."""
     scenario_type: str          # e.g., "business_deduction"
@@ -63,10 +100,10 @@ class TaxCase:
         """
         Create TaxCase from LLM-generated content with automatic fact classification.
         """
-        classified_facts = []
-        for fact in llm_facts:
-            fact_type = classify_fact_type(fact)
-            classified_facts.append(TaxFact(content=fact, fact_type=fact_type))
+        classified_facts = [
+            TaxFact(content=fact, fact_type=fact_type)
+            for fact, fact_type in zip(llm_facts, classify_facts_bulk(llm_facts))
+        ]
         
         return cls(
             scenario_type=scenario_type,
@@ -77,6 +114,24 @@ class TaxCase:
             reasoning_steps=reasoning_steps
         )
     
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TaxCase':
+        """Create TaxCase from the dictionary format produced by to_dict()."""
+        return cls(
+            scenario_type=data["scenario_type"],
+            narrative=data["narrative"],
+            facts=[TaxFact(content=f["content"], fact_type=f["type"]) for f in data["facts"]],
+            question=data["question"],
+            correct_answer=data["correct_answer"],
+            reasoning_steps=list(data["reasoning_steps"])
+        )
+    
+    @classmethod
+    def from_json_bytes(cls, raw: bytes) -> 'TaxCase':
+        """Create TaxCase from the raw contents of a saved case file."""
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        return cls.from_dict(data)
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert TaxCase to dictionary for JSON export."""
         return {
@@ -108,8 +163,27 @@ class TaxCase:
             filename = f"{self.scenario_type}.json"
             filepath = os.path.join(scenario_dir, filename)
         
-        with open(filepath, 'w') as f:
-            json.dump(self.to_dict(), f, indent=2)
+        if orjson is not None:
+            payload = orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(self.to_dict(), indent=2).encode('utf-8')
+        
+        # Write the whole payload to a unique temp file in the same directory, flush it to disk,
+        # then swap it in so readers never see a partial case, even after a crash
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath) or ".", suffix=".tmp")
+        replaced = False
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates owner-only files; give saved cases the mode open() would
+            os.chmod(tmp_path, _NEW_FILE_MODE)
+            os.replace(tmp_path, filepath)
+            replaced = True
+        finally:
+            if not replaced:
+                os.unlink(tmp_path)
         
         return filepath
     
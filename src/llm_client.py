@@ -2,18 +2,37 @@
 LLM client for Groq API integration.
 Handles communication with Groq models for tax case generation.
 """
+import json
 import os
-from typing import Optional, List
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Iterator, Tuple
 from groq import Groq
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Prefix of the text returned in place of a completion when an API call fails
+ERROR_PREFIX = "Error: "
+
+
+@lru_cache(maxsize=4)
+def _shared_groq(api_key: str) -> Groq:
+    """One Groq SDK client, and so one pool of HTTP connections, per resolved API key."""
+    return Groq(api_key=api_key)
+
 
 class GroqClient:
 
-    """Simple client for Groq API with tax-specific methods."""
+    """
+    Simple client for Groq API with tax-specific methods.
+    
+    Prompts keep static instructions in the system message and put per-call
+    content last, so the shared prefix is byte-identical across calls and
+    eligible for provider-side prompt caching (which typically only applies
+    to prefixes of 1024 tokens or more). Do not interpolate per-call values
+    such as timestamps into system prompts.
+    """
     
     def __init__(self, api_key: Optional[str] = None, model: Optional[str] = None) -> None:
         """
@@ -32,7 +51,9 @@ class GroqClient:
         if not self.api_key:
             raise ValueError("GROQ_API_KEY must be set in environment or provided directly")
         
-        self.client = Groq(api_key=self.api_key)
+        # Clients with the same key reuse pooled connections;
+        # reassigning self.client affects only this instance
+        self.client = _shared_groq(self.api_key)
 
     
     def generate_dynamic_answer(self, scenario_type: str, facts: list, narrative: str, question: str) -> str:
@@ -51,7 +72,7 @@ class GroqClient:
             "If the deduction or credit is zero, output '0'."
         )
 
-        facts_text = "\n".join([f"- {fact}" for fact in facts])
+        facts_text = "\n".join(f"- {fact}" for fact in facts)
         user_prompt = f"Scenario: {scenario_type}\n\nNarrative:\n{narrative}\n\nFacts:\n{facts_text}\n\nQuestion: {question}\n\nAnswer:"
         response = self.generate_with_system_prompt(system_prompt, user_prompt, max_tokens=50)
         return response.strip()
@@ -78,7 +99,7 @@ class GroqClient:
             )
             return response.choices[0].message.content.strip()
         except Exception as e:
-            return f"Error: {str(e)}"
+            return f"{ERROR_PREFIX}{e}"
     
     def generate_with_system_prompt(self, system_prompt: str, user_prompt: str, 
                                   max_tokens: int = 1000, temperature: float = 0.7) -> str:
@@ -106,7 +127,7 @@ class GroqClient:
             )
             return response.choices[0].message.content.strip()
         except Exception as e:
-            return f"Error: {str(e)}"
+            return f"{ERROR_PREFIX}{e}"
     
     def generate_tax_facts(self, scenario_type: str, context: str = "") -> List[str]:
         """
@@ -119,48 +140,180 @@ class GroqClient:
         Returns:
             List of exactly 5 cleaned tax facts as strings, fallback facts if generation fails
         """
+        system_prompt, user_prompt = self._tax_facts_prompts(scenario_type, context)
+        response = self.generate_with_system_prompt(system_prompt, user_prompt, max_tokens=400)
+        
+        # Clean and parse response
+        facts = []
+        for line in response.split('\n'):
+            clean_line = self._clean_fact_line(line)
+            if clean_line:  # Only add non-empty lines
+                facts.append(clean_line)
+        
+        return facts[:5]  # Return exactly 5 facts
+    
+    def stream_tax_facts(self, scenario_type: str, context: str = "") -> Iterator[str]:
+        """
+        Stream clean tax facts for a specific scenario as the model produces them.
+        
+        Args:
+            scenario_type: Type of tax scenario (e.g., "business_meal_deduction")
+            context: Additional context information for generation (default: "")
+            
+        Returns:
+            Iterator over at most 5 cleaned tax facts
+            
+        Raises:
+            Exception: Whatever the API raises when the request or the stream fails
+        """
+        system_prompt, user_prompt = self._tax_facts_prompts(scenario_type, context)
+        count = 0
+        buffer = ""
+        stream = self.client.chat.completions.create(
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            model=self.model,
+            max_tokens=400,
+            temperature=0.7,
+            stream=True
+        )
+        # Close the HTTP response even when we stop early or the consumer abandons the iterator
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                buffer += chunk.choices[0].delta.content or ""
+                while '\n' in buffer:
+                    line, buffer = buffer.split('\n', 1)
+                    clean_line = self._clean_fact_line(line)
+                    if clean_line:
+                        yield clean_line
+                        count += 1
+                        if count == 5:
+                            return
+        finally:
+            stream.close()
+        
+        clean_line = self._clean_fact_line(buffer)
+        if clean_line:
+            yield clean_line
+    
+    @staticmethod
+    def _tax_facts_prompts(scenario_type: str, context: str) -> Tuple[str, str]:
+        """Build the system and user prompts for tax fact generation."""
+        # Static instructions and examples come first and the per-call task last,
+        # so providers with prompt caching can reuse the shared prefix
         system_prompt = """You are a tax law expert. Generate realistic, accurate tax facts.
         Return ONLY the facts, one per line. No numbering, no explanations, no formatting.
-        Each fact should be 1-2 sentences maximum."""
-        
-        user_prompt = f"""Generate exactly 5 tax facts for a {scenario_type} scenario.
-        Context: {context}
+        Each fact should be 1-2 sentences maximum.
         
         Example format:
         John spent $500 on client lunch at a business restaurant
         Business meals are 50% deductible if ordinary and necessary
         Client meetings are ordinary business practice for sales
         Under IRC Section 274, business meals have deduction limits
-        The expense qualifies for 50% deduction
+        The expense qualifies for 50% deduction"""
         
-        Generate similar facts - clean, concise, no formatting."""
+        user_prompt = f"""Context: {context}
+---
+TASK:
+Generate exactly 5 tax facts for a {scenario_type} scenario.
+Generate similar facts - clean, concise, no formatting."""
         
-        response = self.generate_with_system_prompt(system_prompt, user_prompt, max_tokens=400)
+        return system_prompt, user_prompt
+    
+    @staticmethod
+    def _clean_fact_line(line: str) -> Optional[str]:
+        """Strip numbering, markdown and category labels from one line of fact output."""
+        line = line.strip()
+        # Skip empty lines and common unwanted patterns
+        if not line or line.lower().startswith(('here are', 'tax facts', 'facts for')):
+            return None
+        # Remove numbering and formatting
+        clean_line = line.lstrip('1234567890.- ').replace('**', '').replace('*', '')
+        # Remove category labels
+        if ':' in clean_line and any(keyword in clean_line.lower() 
+                                   for keyword in ['story fact', 'rule fact', 'conclusion fact']):
+            clean_line = clean_line.split(':', 1)[1].strip()
+        return clean_line or None
+    
+    def generate_full_case(
+        self, scenario_type: str, context: str, question: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Generate facts, narrative, answer and reasoning for a case in a single request.
         
-        # Clean and parse response
-        facts = []
-        for line in response.split('\n'):
-            line = line.strip()
-            # Skip empty lines and common unwanted patterns
-            if line and not line.lower().startswith(('here are', 'tax facts', 'facts for')):
-                # Remove numbering and formatting
-                clean_line = line.lstrip('1234567890.- ').replace('**', '').replace('*', '')
-                # Remove category labels
-                if ':' in clean_line and any(keyword in clean_line.lower() 
-                                           for keyword in ['story fact', 'rule fact', 'conclusion fact']):
-                    clean_line = clean_line.split(':', 1)[1].strip()
-                
-                if clean_line:  # Only add non-empty lines
-                    facts.append(clean_line)
+        Args:
+            scenario_type: Type of tax scenario (e.g., "business_meal_deduction")
+            context: Domain context and any additional generation context
+            question: The question the case must answer
+            
+        Returns:
+            Dictionary with "facts", "narrative", "answer" and "reasoning_steps",
+            or None if the request fails, the response is not a JSON object,
+            or any component is missing or empty
+        """
+        system_prompt = """You are a tax law expert.
+        Create a complete, realistic tax reasoning case.
+        Respond with a single JSON object with exactly these keys:
+        "facts": list of exactly 5 concise tax facts (1-2 sentences each, no numbering),
+        "narrative": 2-3 paragraph story that naturally incorporates the first 3 facts,
+        "answer": ONLY the final deductible amount or credit as a number or dollar amount
+        ("0" if none),
+        "reasoning_steps": list of exactly 4 clear steps connecting the facts to the answer.
+        Base the answer only on the facts and apply all statutory limits relevant to the domain."""
         
-        return facts[:5]  # Return exactly 5 facts
+        # Domain context first, per-case task last, to keep the prompt prefix cacheable
+        user_prompt = f"""Context: {context}
+---
+TASK:
+Scenario: {scenario_type}
+Question: {question}"""
+        
+        try:
+            response = self.client.chat.completions.create(
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                model=self.model,
+                max_tokens=1500,
+                temperature=0.7,
+                response_format={"type": "json_object"}
+            )
+            data = json.loads(response.choices[0].message.content)
+        except Exception:
+            return None
+        
+        if not isinstance(data, dict):
+            return None
+        
+        facts = data.get("facts")
+        steps = data.get("reasoning_steps")
+        if not (isinstance(facts, list) and isinstance(steps, list)
+                and data.get("narrative") is not None and data.get("answer") is not None):
+            return None
+        
+        case = {
+            # Same fact format as the streaming path
+            "facts": [clean for clean in map(self._clean_fact_line, map(str, facts)) if clean][:5],
+            "narrative": str(data["narrative"]).strip(),
+            "answer": str(data["answer"]).strip(),
+            "reasoning_steps": [str(step).strip() for step in steps if str(step).strip()][:4]
+        }
+        # An empty component means the reply is unusable; let the caller fall back
+        if not all(case.values()):
+            return None
+        return case
     
     def generate_tax_narrative(self, scenario_type: str, facts: List[str]) -> str:
         """Generate a narrative story from tax facts."""
         system_prompt = """You are a skilled writer. Create a realistic tax scenario narrative.
         Write 2-3 paragraphs that naturally incorporate the given facts."""
         
-        facts_text = "\n".join([f"- {fact}" for fact in facts])
+        facts_text = "\n".join(f"- {fact}" for fact in facts)
         
         user_prompt = f"""Write a realistic narrative for a {scenario_type} that includes these facts:
 
@@ -176,7 +329,7 @@ Create a professional, clear story that feels natural."""
         system_prompt = """You are a tax expert. Create clear, logical reasoning steps.
         Return only the steps, one per line, no numbering."""
         
-        facts_text = "\n".join([f"- {fact}" for fact in facts])
+        facts_text = "\n".join(f"- {fact}" for fact in facts)
         
         user_prompt = f"""Given these facts about {scenario_type}:
 
@@ -2,13 +2,21 @@
 Fully dynamic tax case generator - all domain information from JSON templates.
 Add new domains by editing tax_domains.json only!
 """
+import logging
 import os
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional, Tuple
 
-from core import TaxCase, TaxFact, classify_fact_type
-from llm_client import GroqClient
+from core import TaxCase, TaxFact, classify_facts_bulk
+from llm_client import ERROR_PREFIX, GroqClient
 from tax_domains import TaxDomainManager
 
+log = logging.getLogger(__name__)
+
+# Question used when a domain's template defines no typical questions
+FALLBACK_QUESTION = "What is the tax treatment?"
+
 
 class TaxGenerator:
     """
@@ -21,56 +29,110 @@ class TaxGenerator:
         self.llm_client = GroqClient(api_key=api_key)
         self.domain_manager = TaxDomainManager()
         self.generated_scenarios = set()
+        # Scenarios whose last batch generation attempt raised, for retry_failed()
+        self.failed_scenarios = set()
+        # Parsed existing cases keyed by absolute file path, with the file mtime they were read at;
+        # callers get copies so they never share mutable state
+        self._case_cache: Dict[str, Tuple[float, TaxCase]] = {}
+        # Read-only domain info views, valid until templates are reloaded
+        self._info_cache: Dict[str, Mapping[str, Any]] = {}
         # Get all primary questions dynamically from templates
         self.domain_questions = self.domain_manager.get_domain_questions()
-        print(f"✓ Dynamic generator initialized with {len(self.domain_questions)} domains from templates")
+        log.info(
+            "✓ Dynamic generator initialized with %d domains from templates",
+            len(self.domain_questions),
+        )
     
     def generate_case(self, scenario_type: str, context: str = "") -> TaxCase:
         """
         Generate a complete tax reasoning case using dynamic templates.
         All domain information comes from tax_domains.json!
+        
+        Raises:
+            ValueError: If the domain is not defined in the templates
+            RuntimeError: If the LLM produced no facts or a request failed; nothing is saved
         """
         # Check if domain exists in templates
         if scenario_type not in self.domain_manager.get_all_domains():
             available_domains = list(self.domain_manager.get_all_domains().keys())
-            raise ValueError(f"Domain '{scenario_type}' not found in templates. Available: {available_domains}")
+            raise ValueError(
+                f"Domain '{scenario_type}' not found in templates. Available: {available_domains}"
+            )
         
-        # Check if already generated (in memory or on disk)
-        case_file_path = f"data/generated/{scenario_type}/{scenario_type}.json"
-        if scenario_type in self.generated_scenarios or os.path.exists(case_file_path):
-            print(f"Case for {scenario_type} already exists, skipping duplicate generation")
-            loaded_case = self._load_existing_case(scenario_type)
-            if loaded_case is not None:
-                self.generated_scenarios.add(scenario_type)
-                return loaded_case
-            else:
-                print(f"Warning: Expected case file for {scenario_type} but could not load. Regenerating...")
+        # Check if already generated on disk; the loader's stat doubles as the existence check
+        loaded_case = self._load_existing_case(scenario_type)
+        if loaded_case is not None:
+            log.info("Case for %s already exists, skipping duplicate generation", scenario_type)
+            self.generated_scenarios.add(scenario_type)
+            return loaded_case
+        if scenario_type in self.generated_scenarios:
+            log.warning(
+                "Expected case file for %s but could not load. Regenerating...", scenario_type
+            )
         
-        print(f"Generating {scenario_type} case using dynamic templates...")
+        log.info("Generating %s case using dynamic templates...", scenario_type)
         
         # Get domain context dynamically from templates
         domain_context = self.domain_manager.get_domain_context(scenario_type)
         
-        # Generate all components using template information
-        raw_facts = self.llm_client.generate_tax_facts(scenario_type, domain_context + "\n" + context)
-        raw_narrative = self.llm_client.generate_tax_narrative(scenario_type, raw_facts[:3])
-        
         # Get question dynamically from templates
-        question = self._get_dynamic_question(scenario_type)
+        question = self.domain_questions.get(scenario_type, FALLBACK_QUESTION)
+        
+        # Generate all components in one request, falling back to step-by-step generation
+        full_case = self.llm_client.generate_full_case(
+            scenario_type, domain_context + "\n" + context, question
+        )
+        if full_case is not None:
+            raw_facts = full_case["facts"]
+            raw_narrative = full_case["narrative"]
+            answer = full_case["answer"]
+            reasoning_steps = full_case["reasoning_steps"]
+        else:
+            # Stream facts and start the narrative as soon as the three it uses have arrived
+            raw_facts = []
+            narrative_future = None
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                facts_stream = self.llm_client.stream_tax_facts(
+                    scenario_type, domain_context + "\n" + context
+                )
+                for fact in facts_stream:
+                    raw_facts.append(fact)
+                    if len(raw_facts) == 3:
+                        narrative_future = executor.submit(
+                            self.llm_client.generate_tax_narrative, scenario_type, raw_facts[:3]
+                        )
+                if not raw_facts:
+                    raise RuntimeError(f"No tax facts generated for {scenario_type}")
+                if narrative_future is None:
+                    narrative_future = executor.submit(
+                        self.llm_client.generate_tax_narrative, scenario_type, raw_facts[:3]
+                    )
+                raw_narrative = narrative_future.result()
 
-        # Generate answer dynamically using LLM based on facts, narrative, and question
-        answer = self.llm_client.generate_dynamic_answer(scenario_type, raw_facts, raw_narrative, question)
+            # Generate answer dynamically using LLM based on facts, narrative, and question
+            answer = self.llm_client.generate_dynamic_answer(
+                scenario_type, raw_facts, raw_narrative, question
+            )
 
-        # Generate reasoning steps using template context
-        reasoning_steps = self.llm_client.generate_reasoning_steps(
-            scenario_type, raw_facts, question, answer
-        )
+            # Generate reasoning steps using template context
+            reasoning_steps = self.llm_client.generate_reasoning_steps(
+                scenario_type, raw_facts, question, answer
+            )
+
+        # Never save a failed generation: it would be loaded as a finished case on every later run
+        if not raw_facts:
+            raise RuntimeError(f"No tax facts generated for {scenario_type}")
+        for text in (raw_narrative, answer, *reasoning_steps):
+            if text.startswith(ERROR_PREFIX):
+                raise RuntimeError(
+                    f"LLM request failed for {scenario_type}: {text[len(ERROR_PREFIX):]}"
+                )
 
         # Create structured case
-        structured_facts = []
-        for fact_text in raw_facts:
-            fact_type = classify_fact_type(fact_text)
-            structured_facts.append(TaxFact(content=fact_text, fact_type=fact_type))
+        structured_facts = [
+            TaxFact(content=fact_text, fact_type=fact_type)
+            for fact_text, fact_type in zip(raw_facts, classify_facts_bulk(raw_facts))
+        ]
 
         case = TaxCase(
             scenario_type=scenario_type,
@@ -85,97 +147,143 @@ class TaxGenerator:
         case_path = case.save_to_file()
         self.generated_scenarios.add(scenario_type)
 
-        print(f"✓ Case generated using dynamic template and saved to {case_path}")
+        log.info("✓ Case generated using dynamic template and saved to %s", case_path)
         return case
     
-    def _get_dynamic_question(self, scenario_type: str) -> str:
-        """
-        Get question dynamically from loaded templates.
-        """
-        if scenario_type in self.domain_questions:
-            return self.domain_questions[scenario_type]
-        else:
-            # Fallback - should not happen if domain exists in templates
-            return "What is the tax treatment?"
-    
     def _load_existing_case(self, scenario_type: str) -> Optional[TaxCase]:
-        """Load existing case if it exists."""
-        filepath = f"data/generated/{scenario_type}/{scenario_type}.json"
+        """Load a fresh copy of the existing case if it exists."""
+        filepath = os.path.abspath(f"data/generated/{scenario_type}/{scenario_type}.json")
         
-        if os.path.exists(filepath):
+        try:
+            mtime = os.stat(filepath).st_mtime
+        except OSError:
+            return None
+        
+        cached = self._case_cache.get(filepath)
+        if cached is None or cached[0] != mtime:
             try:
-                import json
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
-                
-                # Reconstruct TaxCase from saved data
-                facts = [TaxFact(content=f["content"], fact_type=f["type"]) for f in data["facts"]]
-                
-                return TaxCase(
-                    scenario_type=data["scenario_type"],
-                    narrative=data["narrative"],
-                    facts=facts,
-                    question=data["question"],
-                    correct_answer=data["correct_answer"],
-                    reasoning_steps=data["reasoning_steps"]
-                )
+                with open(filepath, 'rb') as f:
+                    case = TaxCase.from_json_bytes(f.read())
             except Exception as e:
-                print(f"Error loading existing case: {e}")
+                log.warning("Error loading existing case: %s", e)
+                return None
+            cached = self._case_cache[filepath] = (mtime, case)
         
-        return None
+        return TaxCase.from_dict(cached[1].to_dict())
     
-    def generate_all_domains(self) -> List[TaxCase]:
+    def generate_all_domains(self, max_workers: int = 4) -> List[TaxCase]:
         """
         Generate cases for all domains found in templates.
         Completely dynamic - no hardcoded domain list!
+        
+        Domains are generated concurrently since each case is dominated by LLM
+        network latency. Concurrent requests make rate limiting more likely, and
+        the Groq SDK only retries a 429 a few times before giving up. A domain
+        whose generation fails is not saved; it is skipped and recorded in
+        failed_scenarios so it can be retried later with retry_failed().
+        Lower max_workers if many domains fail with rate-limit errors.
+        
+        Args:
+            max_workers: Maximum number of domains generated at the same time
+            
+        Returns:
+            Generated cases, in template order
         """
         # Get all domains dynamically from templates
         available_domains = list(self.domain_manager.get_all_domains().keys())
         
-        print(f"Generating cases for all {len(available_domains)} domains from templates...")
+        log.info("Generating cases for all %d domains from templates...", len(available_domains))
+        return self._generate_many(available_domains, max_workers)
+    
+    def retry_failed(self, max_workers: int = 4) -> List[TaxCase]:
+        """
+        Retry only the scenarios that failed in earlier batch runs.
+        
+        Args:
+            max_workers: Maximum number of domains generated at the same time
+            
+        Returns:
+            Cases generated by this retry; scenarios that fail again stay in failed_scenarios
+        """
+        failed = sorted(self.failed_scenarios)
+        log.info("Retrying %d failed scenarios...", len(failed))
+        return self._generate_many(failed, max_workers)
+    
+    def _generate_many(self, scenario_types: List[str], max_workers: int) -> List[TaxCase]:
+        """Generate cases concurrently, returning them in the order of scenario_types."""
+        if not scenario_types:
+            return []
+        
+        # Submit domains with similar prompt prefixes back-to-back so provider prompt
+        # caches stay warm; each worker handles a distinct scenario, so no extra locking
+        ordered = sorted(scenario_types, key=self._prompt_prefix)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(ordered))) as executor:
+            results = dict(
+                zip(ordered, executor.map(self._generate_case_or_record_failure, ordered))
+            )
         
-        cases = []
-        for domain in available_domains:
-            case = self.generate_case(domain)
-            if case:
-                cases.append(case)
+        return [results[scenario] for scenario in scenario_types if results[scenario]]
+    
+    def _generate_case_or_record_failure(self, scenario_type: str) -> Optional[TaxCase]:
+        """Generate one case, recording the scenario as failed instead of aborting the batch."""
+        try:
+            case = self.generate_case(scenario_type)
+        except Exception as e:
+            log.warning("Failed to generate %s case: %s", scenario_type, e)
+            self.failed_scenarios.add(scenario_type)
+            return None
         
-        return cases
+        self.failed_scenarios.discard(scenario_type)
+        return case
+    
+    def _prompt_prefix(self, scenario_type: str) -> str:
+        """Leading part of the generation prompt for a domain, used to group similar prompts."""
+        try:
+            return self.domain_manager.get_domain_context(scenario_type)[:256]
+        except ValueError:
+            # Unknown domains sort first; generate_case rejects them and records the failure
+            return ""
     
     def reload_templates_and_regenerate(self):
         """
         Reload templates from JSON and update question mappings.
         Useful after manually editing tax_domains.json
         """
-        print("Reloading templates and updating generator...")
+        log.info("Reloading templates and updating generator...")
         
         # Reload domains from JSON
         self.domain_manager.reload_domains()
         
-        # Update question/answer mappings dynamically
-        self.question_templates = self.domain_manager.get_domain_questions_answers()
+        # Refresh cached questions; domain contexts are rebuilt by the manager on reload
+        self.domain_questions = self.domain_manager.get_domain_questions()
+        self._info_cache.clear()
+        # Domains removed from the templates can no longer be retried
+        self.failed_scenarios.intersection_update(self.domain_questions)
         
-        print(f"✓ Reloaded {len(self.question_templates)} domains from updated templates")
+        log.info("✓ Reloaded %d domains from updated templates", len(self.domain_questions))
     
     def get_available_domains(self) -> List[str]:
         """Get list of all domains available in templates."""
         return list(self.domain_manager.get_all_domains().keys())
     
-    def get_domain_info(self, domain_name: str) -> Dict[str, Any]:
-        """Get complete information about a domain from templates."""
-        domain = self.domain_manager.get_domain(domain_name)
-        question, answer = self._get_dynamic_question_answer(domain_name)
+    def get_domain_info(self, domain_name: str) -> Mapping[str, Any]:
+        """Get complete, read-only information about a domain from templates."""
+        info = self._info_cache.get(domain_name)
+        if info is not None:
+            return info
         
-        return {
+        domain = self.domain_manager.get_domain(domain_name)
+        info = MappingProxyType({
             "domain_name": domain.domain_name,
             "description": domain.description,
             "typical_questions": domain.typical_questions,
-            "primary_question": question,
-            "expected_answer": answer,
+            "primary_question": self.domain_questions.get(domain_name, FALLBACK_QUESTION),
             "reasoning_pattern": domain.reasoning_pattern,
             "required_facts": domain.required_facts,
             "tax_rules": domain.tax_rules
-        }
+        })
+        self._info_cache[domain_name] = info
+        return info
     
     def get_generated_scenarios(self) -> List[str]:
         """Get list of scenarios that have been generated."""
@@ -0,0 +1,37 @@
+"""
+Shared pytest fixtures.
+Expensive objects are built once per test session; tests must not mutate them.
+"""
+import pytest
+from core import TaxCase, TaxFact
+from llm_client import GroqClient
+from tax_domains import TaxDomainManager
+from tax_generator import TaxGenerator
+
+
+@pytest.fixture(scope="session")
+def domain_manager():
+    """Domain manager loaded from the repository templates."""
+    return TaxDomainManager()
+
+@pytest.fixture(scope="session")
+def tax_generator():
+    """Generator with a placeholder API key; no LLM requests are made at construction."""
+    return TaxGenerator(api_key="test-key")
+
+@pytest.fixture(scope="session")
+def llm_client():
+    """One GroqClient, and so one HTTP connection pool, shared by the whole session."""
+    return GroqClient(api_key="test-key")
+
+@pytest.fixture(scope="session")
+def sample_case():
+    """Small, fully populated case shared by tests that only read or save it."""
+    return TaxCase(
+        scenario_type="test",
+        narrative="Test narrative",
+        facts=[TaxFact("Spent $100", "story")],
+        question="Test?",
+        correct_answer="$50",
+        reasoning_steps=["Step 1"]
+    )
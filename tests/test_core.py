@@ -1,21 +1,16 @@
-import sys
 import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../')))
-
+import shutil
+import json
 import pytest
-from src.core import TaxFact, TaxCase, classify_fact_type
-
-def test_classify_fact_type_story():
-    fact = "The taxpayer spent $500 on a business meal."
-    assert classify_fact_type(fact) == "story"
+from core import TaxFact, TaxCase, classify_fact_type, classify_facts_bulk
 
-def test_classify_fact_type_rule():
-    fact = "Business meals are 50% deductible under IRC Section 274."
-    assert classify_fact_type(fact) == "rule"
-
-def test_classify_fact_type_conclusion():
-    fact = "Therefore, the deduction allowed is $250."
-    assert classify_fact_type(fact) == "conclusion"
+@pytest.mark.parametrize("fact,expected", [
+    ("The taxpayer spent $500 on a business meal.", "story"),
+    ("Business meals are 50% deductible under IRC Section 274.", "rule"),
+    ("Therefore, the deduction allowed is $250.", "conclusion"),
+])
+def test_classify_fact_type(fact, expected):
+    assert classify_fact_type(fact) == expected
 
 def test_tax_fact_str():
     fact = TaxFact(content="Test content", fact_type="rule")
@@ -35,3 +30,51 @@ def test_tax_case_init():
     assert case.narrative.startswith("A business meal")
     assert case.facts[0].fact_type == "story"
     assert case.correct_answer == "$250"
+
+def test_save_to_file_after_changing_directory(sample_case, tmp_path, monkeypatch):
+    for name in ("first", "second"):
+        workdir = tmp_path / name
+        workdir.mkdir()
+        monkeypatch.chdir(workdir)
+        assert os.path.exists(sample_case.save_to_file())
+
+def test_save_to_file_after_deleting_case_directory(sample_case, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    shutil.rmtree(os.path.dirname(sample_case.save_to_file()))
+    assert os.path.exists(sample_case.save_to_file())
+
+def test_save_to_file_respects_umask(sample_case, tmp_path):
+    umask = os.umask(0)
+    os.umask(umask)
+    path = sample_case.save_to_file(str(tmp_path / "case.json"))
+    assert os.stat(path).st_mode & 0o777 == 0o666 & ~umask
+
+def test_save_to_file_failure_leaves_no_temp_file(sample_case, tmp_path, monkeypatch):
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        sample_case.save_to_file(str(tmp_path / "case.json"))
+    assert list(tmp_path.iterdir()) == []
+
+def test_classify_facts_bulk_matches_single():
+    facts = [
+        "The taxpayer spent $500 on a business meal.",
+        "Business meals are 50% deductible under IRC Section 274.",
+        "Therefore, the deduction allowed is $250.",
+    ]
+    assert classify_facts_bulk(facts) == ["story", "rule", "conclusion"]
+    assert classify_facts_bulk(facts) == [classify_fact_type(f) for f in facts]
+
+def test_tax_case_dict_round_trip():
+    case = TaxCase.from_llm_output(
+        scenario_type="business_meal_deduction",
+        llm_facts=["John spent $500 on a client lunch", "Business meals are 50% deductible"],
+        narrative="John met a client for lunch.",
+        question="How much is deductible?",
+        answer="$250",
+        reasoning_steps=["Apply 50% rule"]
+    )
+    assert TaxCase.from_dict(case.to_dict()) == case
+    assert TaxCase.from_json_bytes(json.dumps(case.to_dict()).encode()) == case
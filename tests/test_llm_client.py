@@ -0,0 +1,137 @@
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from groq import Groq
+from llm_client import GroqClient
+
+
+def _client_returning(content):
+    """GroqClient whose chat completions always return the given message content."""
+    client = GroqClient(api_key="test-key")
+    message = SimpleNamespace(content=content)
+    response = SimpleNamespace(choices=[SimpleNamespace(message=message)])
+    completions = SimpleNamespace(create=lambda **kwargs: response)
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client
+
+def test_generate_full_case_parses_json():
+    client = _client_returning(json.dumps({
+        "facts": ["John spent $500 on a client lunch", "Business meals are 50% deductible"],
+        "narrative": "John met a client for lunch.",
+        "answer": 250,
+        "reasoning_steps": ["Identify the expense", "Apply the 50% limit"]
+    }))
+    result = client.generate_full_case("business_meal_deduction", "context", "How much?")
+    assert result["answer"] == "250"
+    assert len(result["facts"]) == 2
+    assert result["reasoning_steps"][1] == "Apply the 50% limit"
+
+@pytest.mark.parametrize("content", [
+    "not json",
+    "[1, 2, 3]",
+    '"just a string"',
+    json.dumps({"facts": [], "narrative": "n", "answer": "", "reasoning_steps": []}),
+    json.dumps({
+        "facts": ["Here are the facts:"], "narrative": "n", "answer": "1", "reasoning_steps": ["s"]
+    }),
+    json.dumps({"facts": ["f"], "narrative": "n", "answer": " ", "reasoning_steps": ["s"]}),
+    json.dumps({"facts": ["f"], "narrative": "", "answer": "1", "reasoning_steps": ["s"]}),
+    json.dumps({"facts": ["f"], "narrative": "n", "answer": "1", "reasoning_steps": [""]}),
+])
+def test_generate_full_case_invalid_json(content):
+    client = _client_returning(content)
+    assert client.generate_full_case("business_meal_deduction", "context", "How much?") is None
+
+def test_generate_full_case_cleans_facts():
+    client = _client_returning(json.dumps({
+        "facts": [
+            "1. **John** spent $500 on a client lunch",
+            "Story fact: Lunch was with a client",
+            "",
+        ],
+        "narrative": "John met a client for lunch.",
+        "answer": "$250",
+        "reasoning_steps": ["Apply the 50% limit"]
+    }))
+    result = client.generate_full_case("business_meal_deduction", "context", "How much?")
+    assert result["facts"] == ["John spent $500 on a client lunch", "Lunch was with a client"]
+
+class _FakeStream:
+    """Iterable of streamed chunks that records whether it was closed."""
+
+    def __init__(self, pieces):
+        self.chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=p))])
+            for p in pieces
+        ]
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+def _client_streaming(stream):
+    """GroqClient whose streamed chat completions return the given stream."""
+    client = GroqClient(api_key="test-key")
+    completions = SimpleNamespace(create=lambda **kwargs: stream)
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return client
+
+def test_stream_tax_facts_splits_chunks():
+    stream = _FakeStream([
+        "Here are the facts:\n1. John spent",
+        " $500 on lunch\n",
+        "2. **Meals** are 50% deductible",
+        "",
+    ])
+    facts = list(_client_streaming(stream).stream_tax_facts("business_meal_deduction"))
+    assert facts == ["John spent $500 on lunch", "Meals are 50% deductible"]
+    assert stream.closed
+
+def test_stream_tax_facts_closes_stream_after_five_facts():
+    stream = _FakeStream([f"Fact {i}\n" for i in range(1, 8)])
+    facts = list(_client_streaming(stream).stream_tax_facts("business_meal_deduction"))
+    assert len(facts) == 5
+    assert stream.closed
+
+def test_stream_tax_facts_raises_request_errors():
+    def rate_limited(**kwargs):
+        raise RuntimeError("429 rate limited")
+
+    client = GroqClient(api_key="test-key")
+    completions = SimpleNamespace(create=rate_limited)
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    with pytest.raises(RuntimeError, match="429"):
+        list(client.stream_tax_facts("business_meal_deduction"))
+
+def test_generate_tax_facts_over_stubbed_http():
+    requests = []
+
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={
+            "id": "chatcmpl-test",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "test-model",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": "1. John spent $500 on lunch\n2. **Meals** are 50% deductible",
+                },
+            }]
+        })
+
+    client = GroqClient(api_key="test-key")
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    client.client = Groq(api_key="test-key", http_client=http_client)
+    facts = client.generate_tax_facts("business_meal_deduction")
+    assert facts == ["John spent $500 on lunch", "Meals are 50% deductible"]
+    assert len(requests) == 1
+    assert requests[0]["model"] == client.model
@@ -2,99 +2,27 @@
 Simple test to verify the complete system works.
 Run this from the project root directory.
 """
-import sys
-import os
-sys.path.append('src')
 
-def test_core():
+from core import TaxCase
+
+
+def test_core(sample_case):
     """Test core module."""
-    print("Testing core module...")
-    try:
-        from core import TaxCase, TaxFact
-        
-        facts = [TaxFact("Test expense $100", "story")]
-        case = TaxCase(
-            scenario_type="test",
-            narrative="Test case",
-            facts=facts,
-            question="Test question?",
-            correct_answer="Test answer",
-            reasoning_steps=["Test reasoning"]
-        )
-        
-        print("✓ Core module working")
-        return True
-    except Exception as e:
-        print(f"✗ Core module error: {e}")
-        return False
+    assert TaxCase.from_dict(sample_case.to_dict()) == sample_case
 
-def test_llm_client():
+def test_llm_client(llm_client):
     """Test LLM client."""
-    print("Testing LLM client...")
-    try:
-        from llm_client import GroqClient
-        print("✓ LLM client imports successfully")
-        return True
-    except Exception as e:
-        print(f"✗ LLM client error: {e}")
-        return False
+    assert llm_client._clean_fact_line("1. **Rule fact:** Meals are 50% deductible") == (
+        "Meals are 50% deductible"
+    )
+    assert llm_client._clean_fact_line("Here are the facts:") is None
 
-def test_domains():
+def test_domains(domain_manager):
     """Test tax domains."""
-    print("Testing tax domains...")
-    try:
-        from tax_domains import TaxDomainManager
-        
-        manager = TaxDomainManager()
-        domains = manager.get_all_domains()
-        
-        print(f"✓ Tax domains working ({len(domains)} domains loaded)")
-        return True
-    except Exception as e:
-        print(f"✗ Tax domains error: {e}")
-        return False
-
-def test_generator():
-    """Test tax generator.""" 
-    print("Testing tax generator...")
-    try:
-        from tax_generator import TaxGenerator
-        print("✓ Tax generator imports successfully")
-        return True
-    except Exception as e:
-        print(f"✗ Tax generator error: {e}")
-        return False
+    domains = domain_manager.get_all_domains()
 
-def main():
-    """Run all tests."""
-    print("MuSR-SynTax System Test")
-    print("=" * 40)
-    
-    tests = [
-        test_core,
-        test_llm_client, 
-        test_domains,
-        test_generator
-    ]
-    
-    results = []
-    for test in tests:
-        result = test()
-        results.append(result)
-        print()
-    
-    print("=" * 40)
-    passed = sum(results)
-    total = len(results)
-    
-    print(f"Tests passed: {passed}/{total}")
-    
-    if passed == total:
-        print("✓ All systems working! Ready to run examples.")
-    else:
-        print("✗ Some systems have issues. Check the errors above.")
-    
-    return passed == total
+    assert len(domains) > 0, "no tax domains loaded"
 
-if __name__ == "__main__":
-    main()
\ No newline at end of file
+def test_generator(tax_generator):
+    """Test tax generator."""
+    assert sorted(tax_generator.get_available_domains()) == sorted(tax_generator.domain_questions)
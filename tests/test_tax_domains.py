@@ -0,0 +1,49 @@
+import json
+import os
+
+import pytest
+from tax_domains import TaxDomainManager
+
+
+def test_managers_share_parsed_templates():
+    first = TaxDomainManager()
+    second = TaxDomainManager()
+    assert first.domains is not second.domains
+    domain = first.get_domain("business_meal_deduction")
+    assert domain is second.get_domain("business_meal_deduction")
+
+def test_domain_context_lists_rules(domain_manager):
+    context = domain_manager.get_domain_context("business_meal_deduction")
+    assert context.startswith("Domain: ")
+    assert "- IRC Section 274 - Entertainment expenses" in context
+
+def test_domain_context_unknown_domain(domain_manager):
+    with pytest.raises(ValueError):
+        domain_manager.get_domain_context("not_a_domain")
+
+def test_missing_template_is_not_written_by_default(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = TaxDomainManager()
+    assert "home_office_deduction" in manager.get_all_domains()
+    assert not (tmp_path / "data/templates/tax_domains.json").exists()
+    
+    path = manager.save_templates()
+    assert (tmp_path / path).exists()
+
+def test_same_relative_template_path_in_other_directory(tmp_path, monkeypatch):
+    descriptions = {}
+    for name in ("first", "second"):
+        template = tmp_path / name / "data/templates/tax_domains.json"
+        template.parent.mkdir(parents=True)
+        template.write_text(json.dumps({"domains": {"alpha": {
+            "domain_name": "alpha",
+            "description": f"{name} description",
+            "typical_questions": ["What about alpha?"],
+            "reasoning_pattern": ["Step one"],
+            "required_facts": ["amount"],
+            "tax_rules": ["IRC Section 162 - Business expenses"]
+        }}}))
+        os.utime(template, (0, 0))
+        monkeypatch.chdir(tmp_path / name)
+        descriptions[name] = TaxDomainManager().get_domain("alpha").description
+    assert descriptions == {"first": "first description", "second": "second description"}
@@ -0,0 +1,138 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+from core import TaxCase, TaxFact
+from tax_generator import TaxGenerator
+
+
+@pytest.fixture
+def generator(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return TaxGenerator(api_key="test-key")
+
+class _Stream(list):
+    """Streamed response stand-in: iterable chunks with a close() method."""
+
+    def close(self):
+        pass
+
+def _save_case(scenario_type):
+    case = TaxCase(
+        scenario_type=scenario_type,
+        narrative="A business meal was held.",
+        facts=[TaxFact(content="Spent $100", fact_type="story")],
+        question="How much is deductible?",
+        correct_answer="$50",
+        reasoning_steps=["Apply 50% rule"]
+    )
+    case.save_to_file()
+    return case
+
+def test_load_existing_case_is_memoized(generator):
+    _save_case("business_meal_deduction")
+    path = os.path.abspath("data/generated/business_meal_deduction/business_meal_deduction.json")
+    first = generator._load_existing_case("business_meal_deduction")
+    cached = generator._case_cache[path]
+    second = generator._load_existing_case("business_meal_deduction")
+    assert generator._case_cache[path] is cached
+    assert first == second
+    assert first.correct_answer == "$50"
+
+def test_load_existing_case_returns_independent_copies(generator):
+    _save_case("business_meal_deduction")
+    first = generator._load_existing_case("business_meal_deduction")
+    first.facts.append(TaxFact(content="Extra", fact_type="story"))
+    first.reasoning_steps.append("Extra step")
+    second = generator._load_existing_case("business_meal_deduction")
+    assert len(second.facts) == 1
+    assert second.reasoning_steps == ["Apply 50% rule"]
+
+def test_load_existing_case_after_changing_directory(generator, tmp_path, monkeypatch):
+    _save_case("business_meal_deduction")
+    assert generator._load_existing_case("business_meal_deduction") is not None
+    other = tmp_path / "other"
+    other.mkdir()
+    monkeypatch.chdir(other)
+    assert generator._load_existing_case("business_meal_deduction") is None
+
+def test_load_existing_case_missing(generator):
+    assert generator._load_existing_case("home_office_deduction") is None
+
+def test_generate_case_reuses_saved_case(generator):
+    saved = _save_case("business_meal_deduction")
+    case = generator.generate_case("business_meal_deduction")
+    assert case.narrative == saved.narrative
+    assert "business_meal_deduction" in generator.get_generated_scenarios()
+
+def test_get_domain_info_is_cached(generator):
+    info = generator.get_domain_info("home_office_deduction")
+    assert info["primary_question"] == generator.domain_questions["home_office_deduction"]
+    assert generator.get_domain_info("home_office_deduction") is info
+    with pytest.raises(TypeError):
+        info["description"] = "changed"
+
+def test_generate_all_domains_records_failures(generator, monkeypatch):
+    _save_case("business_meal_deduction")
+    
+    def rate_limited(**kwargs):
+        raise RuntimeError("429 rate limited")
+    
+    completions = SimpleNamespace(create=rate_limited)
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(generator.llm_client, "client", fake_client)
+    cases = generator.generate_all_domains()
+    assert [case.scenario_type for case in cases] == ["business_meal_deduction"]
+    assert "home_office_deduction" in generator.failed_scenarios
+    assert "business_meal_deduction" not in generator.failed_scenarios
+    assert not os.path.exists("data/generated/home_office_deduction/home_office_deduction.json")
+    
+    _save_case("home_office_deduction")
+    retried = generator.retry_failed()
+    assert "home_office_deduction" in [case.scenario_type for case in retried]
+    assert "home_office_deduction" not in generator.failed_scenarios
+
+def test_generators_get_their_own_llm_client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GROQ_MODEL", "first-model")
+    first = TaxGenerator(api_key="test-key")
+    monkeypatch.setenv("GROQ_MODEL", "second-model")
+    second = TaxGenerator(api_key="test-key")
+    assert first.llm_client is not second.llm_client
+    assert (first.llm_client.model, second.llm_client.model) == ("first-model", "second-model")
+    assert first.llm_client.client is second.llm_client.client
+
+def test_generate_case_falls_back_when_full_case_is_unusable(generator, monkeypatch):
+    def create(**kwargs):
+        if kwargs.get("response_format"):
+            content = '{"facts": [], "narrative": "n", "answer": "", "reasoning_steps": []}'
+        elif kwargs.get("stream"):
+            delta = SimpleNamespace(content="John spent $500 on lunch\nMeals are 50% deductible\n")
+            return _Stream([SimpleNamespace(choices=[SimpleNamespace(delta=delta)])])
+        else:
+            content = "$250"
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    completions = SimpleNamespace(create=create)
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(generator.llm_client, "client", fake_client)
+    case = generator.generate_case("business_meal_deduction")
+    assert [fact.content for fact in case.facts] == [
+        "John spent $500 on lunch",
+        "Meals are 50% deductible",
+    ]
+    assert case.correct_answer == "$250"
+
+def test_retry_failed_isolates_unknown_domains(generator):
+    _save_case("home_office_deduction")
+    generator.failed_scenarios.update({"removed_domain", "home_office_deduction"})
+    retried = generator.retry_failed()
+    assert [case.scenario_type for case in retried] == ["home_office_deduction"]
+    assert generator.failed_scenarios == {"removed_domain"}
+
+def test_reload_drops_failed_scenarios_missing_from_templates(generator):
+    generator.domain_manager.save_templates()
+    generator.failed_scenarios.update({"removed_domain", "home_office_deduction"})
+    generator.reload_templates_and_regenerate()
+    assert generator.failed_scenarios == {"home_office_deduction"}